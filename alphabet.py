@@ -1,5 +1,7 @@
+import bisect
+import functools
 from fractions import Fraction
-from typing import List, Set, Dict, Union, Tuple, Callable
+from typing import List, Set, Dict, Union, Tuple, Callable, Optional, Sequence
 
 # -------------------------------
 #     TYPE ALIASES
@@ -24,31 +26,51 @@ class Letter:
             raise ValueError("letter_type must be (rational) or (real)")
 
         if letter_type == LetterType.RATIONAL:
-            self.value = Fraction(value)
+            # Fractions are immutable, no need to copy them
+            self.value = value if type(value) is Fraction else Fraction(value)
         else:  # REAL
-            if not isinstance(value, (int, float, Fraction)):
-                raise ValueError("Real letters must be numeric")
-            self.value = float(value)
+            if type(value) is not float:
+                if not isinstance(value, (int, float, Fraction)):
+                    raise ValueError("Real letters must be numeric")
+                value = float(value)
+            self.value = value
 
         self.letter_type = letter_type
+        # precomputed comparison key and hash
+        self._type_id = 0 if letter_type == LetterType.RATIONAL else 1
+        self._key = (self._type_id, self.value)
+        self._hash = hash(self._key)
+
+    @classmethod
+    def _unchecked(cls, value: Numeric, letter_type: str) -> "Letter":
+        """
+        Build a letter without validation; value must already be a Fraction
+        for rational letters and a float for real ones, e.g. when it is
+        computed from the values of existing letters.
+        """
+        letter = cls.__new__(cls)
+        letter.value = value
+        letter.letter_type = letter_type
+        letter._type_id = 0 if letter_type == LetterType.RATIONAL else 1
+        letter._key = (letter._type_id, value)
+        letter._hash = hash(letter._key)
+        return letter
 
     def __eq__(self, other):
-        return isinstance(other, Letter) and (
-            self.letter_type == other.letter_type and self.value == other.value
-        )
+        return self is other or (isinstance(other, Letter) and self._key == other._key)
     
     def __lt__(self, other):
         if not isinstance(other, Letter):
             return NotImplemented
 
         # require same type for comparison
-        if self.letter_type != other.letter_type:
+        if self._type_id != other._type_id:
             raise TypeError("Cannot compare Rational letter with Real letter")
 
         return self.value < other.value
 
     def __hash__(self):
-        return hash((self.value, self.letter_type))
+        return self._hash
 
     def __repr__(self):
         return f"{self.value}"
@@ -58,49 +80,109 @@ class Letter:
 # -------------------------------
 #     LETTER SEQUENCE
 # -------------------------------
+# the shared empty sequence of each letter type, see LetterSeq.empty
+_EMPTY_SEQS: Dict[Optional[str], "LetterSeq"] = {}
+
+
 class LetterSeq:
-    def __init__(self, letters: List[Letter]):
-        self.letters = letters
+    def __init__(self, letters: Sequence[Letter]):
+        letters = tuple(letters)
+        letter_type = None  # set dynamically when needed
         if letters:
             # Ensure all letters share the same type
-            first_type = letters[0].letter_type
-            if any(l.letter_type != first_type for l in letters):
+            letter_type = letters[0].letter_type
+            if any(l.letter_type != letter_type for l in letters):
                 raise ValueError("All letters in the sequence must have the same type")
-            self.letter_type = first_type
-        else:
-            self.letter_type = None  # set dynamically when needed
+        self._init(letters, letter_type)
+
+    def _init(self, letters: Tuple[Letter, ...], letter_type: Optional[str]) -> None:
+        self.letters: Tuple[Letter, ...] = letters
+        self.letter_type = letter_type
+        self._hash: Optional[int] = None
+        # cached views of the letter values, computed on demand
+        self._values: Optional[Tuple[Numeric, ...]] = None
+        self._distinct_values: Optional[List[Numeric]] = None
+        self._value_index: Optional[Dict[Numeric, int]] = None
+        # comparison patterns, computed on demand (see _signature)
+        self._sig_lt: Optional[Tuple[int, ...]] = None
+        self._sig_id: Optional[Tuple[int, ...]] = None
 
     # --- Constructors ---
     @staticmethod
     def empty(letter_type: str) -> "LetterSeq":
-        seq = LetterSeq([])
-        seq.letter_type = letter_type
+        # sequences are immutable, so one empty sequence per type is shared
+        seq = _EMPTY_SEQS.get(letter_type)
+        if seq is None:
+            seq = _EMPTY_SEQS[letter_type] = LetterSeq._make((), letter_type)
+        return seq
+
+    @staticmethod
+    def _make(letters: Tuple[Letter, ...], letter_type: Optional[str]) -> "LetterSeq":
+        """Build a sequence from letters already known to be of letter_type."""
+        seq = LetterSeq.__new__(LetterSeq)
+        seq._init(letters, letter_type)
         return seq
 
     # --- Core operations ---
     def append(self, letter: Letter) -> "LetterSeq":
         if self.letter_type and letter.letter_type != self.letter_type:
             raise ValueError("Cannot append a letter of mismatched type")
-        return LetterSeq(self.letters + [letter])
+        return LetterSeq._make(self.letters + (letter,), letter.letter_type)
+
+    def append_many(self, letters: Sequence[Letter]) -> List["LetterSeq"]:
+        """Return the one-letter extensions self.append(l) for every l in letters."""
+        if self.letter_type and any(l.letter_type != self.letter_type for l in letters):
+            raise ValueError("Cannot append a letter of mismatched type")
+        prefix = self.letters
+        return [LetterSeq._make(prefix + (l,), l.letter_type) for l in letters]
 
     def remove_by_indices(self, indices: Set[int]) -> "LetterSeq":
-        remaining = [l for i, l in enumerate(self.letters) if i not in indices]
-        if len(remaining) == 0:
-            return LetterSeq.empty(self.letter_type)
-        return LetterSeq(remaining)
+        if not indices:
+            return self  # sequences are immutable, nothing to copy
+        remaining = tuple([l for i, l in enumerate(self.letters) if i not in indices])
+        return LetterSeq._make(remaining, self.letter_type)
+
+    def keep_by_indices(self, indices: Sequence[int]) -> "LetterSeq":
+        """Return the subsequence at the given strictly increasing positions."""
+        if len(indices) == len(self.letters):
+            return self  # all positions are kept
+        letters = self.letters
+        return LetterSeq._make(tuple([letters[i] for i in indices]), self.letter_type)
+
+    @property
+    def values(self) -> Tuple[Numeric, ...]:
+        """The values of the letters, in sequence order."""
+        if self._values is None:
+            self._values = tuple([l.value for l in self.letters])
+        return self._values
+
+    def get_distinct_values(self) -> List[Numeric]:
+        """The distinct values of the letters, in increasing order."""
+        if self._distinct_values is None:
+            self._distinct_values = sorted(set(self.values))
+        return self._distinct_values
 
     def __len__(self) -> int:
         return len(self.letters)
 
     def __eq__(self, other):
-        return (
-            isinstance(other, LetterSeq)
-            and self.letter_type == other.letter_type
-            and self.letters == other.letters
-        )
+        if self is other:
+            return True
+        if not isinstance(other, LetterSeq):
+            return False
+        # sequences whose hashes are both known and differ cannot be equal
+        if (
+            self._hash is not None
+            and other._hash is not None
+            and self._hash != other._hash
+        ):
+            return False
+        return self.letter_type == other.letter_type and self.letters == other.letters
 
     def __hash__(self):
-        return hash(tuple(self.letters))
+        if self._hash is None:
+            self._hash = hash(self.letters)
+        return self._hash
 
     def __repr__(self):
         return "[" + ", ".join(repr(l) for l in self.letters) + "]"
@@ -111,12 +193,16 @@ class LetterSeq:
             return LetterSeq.empty(self.letter_type)
         if length > len(self):
             raise ValueError("Prefix length exceeds sequence length")
-        return LetterSeq(self.letters[:length])
+        if length == len(self):
+            return self
+        return LetterSeq._make(self.letters[:length], self.letter_type)
 
     def get_suffix(self, start_index: int) -> "LetterSeq":
         if start_index < 0 or start_index >= len(self):
             return LetterSeq.empty(self.letter_type)
-        return LetterSeq(self.letters[start_index:])
+        if start_index == 0:
+            return self
+        return LetterSeq._make(self.letters[start_index:], self.letter_type)
     
     # inside LetterSeq class
     def get_letter_extension(self, comparator: Callable[['Letter', 'Letter'], bool]) -> 'LetterSeq':
@@ -139,28 +225,38 @@ class LetterSeq:
             # If sequence is empty, create a default letter of value 0
             return LetterSeq([Letter(0, self.letter_type)])
 
-        # Sort letters by value, but remove redundant appearances
-        sorted_letters = sorted(set(self.letters), key=lambda x: x.value)
-        max_value = sorted_letters[-1].value
-        min_value = sorted_letters[0].value
+        # Sorted values, without redundant appearances
+        values = self.get_distinct_values()
+        letter_type = self.letter_type
 
         if comparator == comp_id:
             # Identity comparator: just add one more letter with value > max
-            return LetterSeq(self.letters + [Letter(max_value + 1, self.letter_type)])
+            return self.append(Letter._unchecked(values[-1] + 1, letter_type))
 
         elif comparator == comp_lt:
             # Less-than comparator: insert midpoints between consecutive letters, plus one above max and below min
-            extended_letters = []
-            for i in range(len(sorted_letters) - 1):
-                extended_letters.append(sorted_letters[i])
-                if sorted_letters[i].value != sorted_letters[i + 1].value:
-                    midpoint = (sorted_letters[i].value + sorted_letters[i + 1].value) / 2
-                    extended_letters.append(Letter(midpoint, self.letter_type))
-            extended_letters.append(sorted_letters[-1])
+            extended_values = [values[0]]
+            if letter_type == LetterType.RATIONAL:
+                # (lo + hi) / 2 as one fraction, normalised once instead of twice
+                for lo, hi in zip(values, values[1:]):
+                    extended_values.append(
+                        Fraction(
+                            lo.numerator * hi.denominator + hi.numerator * lo.denominator,
+                            2 * lo.denominator * hi.denominator,
+                        )
+                    )
+                    extended_values.append(hi)
+            else:
+                for lo, hi in zip(values, values[1:]):
+                    extended_values.append((lo + hi) / 2)
+                    extended_values.append(hi)
             # Add extra letters beyond current range
-            extended_letters.append(Letter(max_value + 1, self.letter_type))
-            extended_letters.append(Letter(min_value - 1, self.letter_type))
-            return LetterSeq(extended_letters)
+            extended_values.append(values[-1] + 1)
+            extended_values.append(values[0] - 1)
+            return LetterSeq._make(
+                tuple([Letter._unchecked(v, letter_type) for v in extended_values]),
+                letter_type,
+            )
 
         else:
             raise ValueError("Unsupported comparator for letter extension")
@@ -170,13 +266,49 @@ class LetterSeq:
             raise ValueError("Cannot concatenate sequences of different types")
         if len(other) == 0 and len(self.letters) == 0:
             return LetterSeq.empty(self.letter_type)
-        return LetterSeq(self.letters + other.letters)
+        return LetterSeq._make(self.letters + other.letters, self.letter_type)
     
+    def _signature(self, comp: Callable[[Numeric, Numeric], bool]) -> Tuple[int, ...]:
+        """
+        Return the comparison pattern of the sequence under comp as a tuple of
+        ints. Two sequences of the same length are of the same type iff their
+        signatures are equal.
+
+        - comp_lt: the dense rank of each value among the distinct values.
+        - comp_id: the index of the first occurrence of each value.
+        - any other comparator: comp(values[i], values[j]) for every pair of
+          positions i != j, the relation checked by is_same_type.
+
+        The signatures for comp_lt and comp_id are cached, since a LetterSeq is
+        not modified after construction.
+        """
+        if comp is comp_lt:
+            if self._sig_lt is None:
+                rank = {v: i for i, v in enumerate(self.get_distinct_values())}
+                self._sig_lt = tuple([rank[v] for v in self.values])
+            return self._sig_lt
+        if comp is comp_id:
+            if self._sig_id is None:
+                first: Dict[Numeric, int] = {}
+                self._sig_id = tuple([first.setdefault(v, len(first)) for v in self.values])
+            return self._sig_id
+        values = self.values
+        return tuple([
+            int(comp(values[i], values[j]))
+            for i in range(len(values))
+            for j in range(len(values))
+            if i != j
+        ])
+
     def index(self, x: Letter) -> int:
-        for i, l in enumerate(self.letters):
-            if x == l:
-                return i
-        return -1
+        """Return the position of the first occurrence of x, or -1 if x does not occur."""
+        if x.letter_type != self.letter_type:
+            return -1
+        if self._value_index is None:
+            self._value_index = {}
+            for i, v in enumerate(self.values):
+                self._value_index.setdefault(v, i)
+        return self._value_index.get(x.value, -1)
 
     # --- Dense mapping ---
     def get_bijective_map(self, other: "LetterSeq") -> Callable[[Letter], Letter]:
@@ -188,32 +320,36 @@ class LetterSeq:
         if not self.letters:
             return lambda c: c  # empty identity map
 
-        s_sorted = sorted(self.letters, key=lambda l: l.value)
-        o_sorted = sorted(other.letters, key=lambda l: l.value)
+        # the mapper only depends on the sorted values (with repetitions) of both sides
+        return _bijective_map(self.letter_type, tuple(sorted(self.values)), tuple(sorted(other.values)))
 
-        def mapper(letter: Letter) -> Letter:
-            if letter.letter_type != self.letter_type:
-                raise ValueError("Wrong letter type for mapping")
 
-            v = letter.value
-            v0, v_last = s_sorted[0].value, s_sorted[-1].value
+@functools.lru_cache(maxsize=4096)
+def _bijective_map(letter_type: str, s_vals: Tuple[Numeric, ...],
+                   o_vals: Tuple[Numeric, ...]) -> Callable[[Letter], Letter]:
+    """Build the order-preserving map sending s_vals onto o_vals; shared by equal pairs."""
+    v0, v_last = s_vals[0], s_vals[-1]
+    o0, o_last = o_vals[0], o_vals[-1]
 
-            if v < v0:
-                mapped = o_sorted[0].value + (v - v0)
-            elif v >= v_last:
-                mapped = o_sorted[-1].value + (v - v_last)
-            else:
-                mapped = o_sorted[-1].value
-                for i in range(len(s_sorted) - 1):
-                    vi, vj = s_sorted[i].value, s_sorted[i + 1].value
-                    if vi <= v < vj:
-                        oi, oj = o_sorted[i].value, o_sorted[i + 1].value
-                        mapped = oi + (v - vi) * (oj - oi) / (vj - vi)
-                        break
+    def mapper(letter: Letter) -> Letter:
+        if letter.letter_type != letter_type:
+            raise ValueError("Wrong letter type for mapping")
+
+        v = letter.value
+        if v < v0:
+            mapped = o0 + (v - v0)
+        elif v >= v_last:
+            mapped = o_last + (v - v_last)
+        else:
+            # s_vals[i] <= v < s_vals[i + 1]
+            i = bisect.bisect_right(s_vals, v) - 1
+            vi, vj = s_vals[i], s_vals[i + 1]
+            oi, oj = o_vals[i], o_vals[i + 1]
+            mapped = oi + (v - vi) * (oj - oi) / (vj - vi)
 
-            return Letter(mapped, other.letter_type)
+        return Letter._unchecked(mapped, letter_type)
 
-        return mapper
+    return mapper
 
 
 # -------------------------------
@@ -233,6 +369,13 @@ def is_same_type(
     """Return True iff two LetterSeqs induce the same comparison pattern."""
     if len(seq1) != len(seq2) or seq1.letter_type != seq2.letter_type:
         return False
+    if seq1 is seq2 or len(seq1) <= 1:
+        # no pairs of positions to compare
+        return True
+
+    if comp is comp_lt or comp is comp_id:
+        # the pattern is fully determined by the cached signatures
+        return seq1._signature(comp) == seq2._signature(comp)
 
     for i in range(len(seq1)):
         for j in range(len(seq1)):
@@ -254,14 +397,43 @@ class Alphabet:
             raise ValueError("Invalid letter type for Alphabet")
         self.letter_type = letter_type
         self.comparator = comparator
+        # letters and sequences made so far, so that equal values share one object
+        self._letters: Dict[Tuple[str, Numeric], Letter] = {}
+        self._sequences: Dict[Tuple[str, Tuple[Numeric, ...]], LetterSeq] = {}
+
+    @property
+    def comparator(self) -> Callable[[Numeric, Numeric], bool]:
+        return self._comparator
+
+    @comparator.setter
+    def comparator(self, comparator: Callable[[Numeric, Numeric], bool]) -> None:
+        self._comparator = comparator
+        # bind test_type to a version specialised for the comparator, if any
+        if comparator is comp_lt:
+            self.test_type = self._test_type_lt
+        elif comparator is comp_id:
+            self.test_type = self._test_type_id
+        else:
+            self.__dict__.pop("test_type", None)
 
     def make_letter(self, value: Numeric) -> Letter:
-        return Letter(value, self.letter_type)
+        key = (self.letter_type, value)
+        letter = self._letters.get(key)
+        if letter is None:
+            letter = self._letters[key] = Letter(value, self.letter_type)
+        return letter
 
     def make_sequence(self, values: List[Numeric]) -> LetterSeq:
         if not values:
             return LetterSeq.empty(self.letter_type)
-        return LetterSeq([self.make_letter(v) for v in values])
+        key = (self.letter_type, tuple(values))
+        seq = self._sequences.get(key)
+        if seq is None:
+            # letters made by the alphabet all share its type
+            seq = self._sequences[key] = LetterSeq._make(
+                tuple([self.make_letter(v) for v in values]), self.letter_type
+            )
+        return seq
     
     def form_sequence(self, letters: List[Letter]):
         if len(letters) <= 0:
@@ -273,7 +445,26 @@ class Alphabet:
         return LetterSeq.empty(self.letter_type)
 
     def test_type(self, seq1: LetterSeq, seq2: LetterSeq) -> bool:
-        return is_same_type(seq1, seq2, self.comparator)
+        return is_same_type(seq1, seq2, self._comparator)
+
+    # test_type is shadowed by one of these when the comparator is comp_lt or comp_id
+
+    def _test_type_lt(self, seq1: LetterSeq, seq2: LetterSeq) -> bool:
+        if len(seq1) != len(seq2) or seq1.letter_type != seq2.letter_type:
+            return False
+        return seq1 is seq2 or seq1._signature(comp_lt) == seq2._signature(comp_lt)
+
+    def _test_type_id(self, seq1: LetterSeq, seq2: LetterSeq) -> bool:
+        if len(seq1) != len(seq2) or seq1.letter_type != seq2.letter_type:
+            return False
+        return seq1 is seq2 or seq1._signature(comp_id) == seq2._signature(comp_id)
+
+    def get_type_signature(self, seq: LetterSeq) -> Tuple[int, ...]:
+        """
+        Return the comparison pattern of seq, so that two sequences of this
+        alphabet pass test_type iff their signatures are equal.
+        """
+        return seq._signature(self.comparator)
 
     def concat_sequences(self, seq1: LetterSeq, seq2: LetterSeq) -> LetterSeq:
         return seq1.concat(seq2)
@@ -1,66 +1,117 @@
 from fractions import Fraction
-from typing import List, Set, Dict, Tuple, Optional
+from typing import List, Set, FrozenSet, Dict, Tuple, Optional, Callable, Union, Iterable, Iterator
 import re
 from typing import TextIO
-from alphabet import Alphabet, LetterSeq, Letter, LetterType, comp_lt, comp_id
+from alphabet import Alphabet, LetterSeq, Letter, LetterType, Numeric, comp_lt, comp_id
 import bisect
+import functools
+from collections import deque
 
 # -------------------------------
 #     REGISTER AUTOMATON
 # -------------------------------
 
+# line formats of to_text(), used by from_text()
+#   0 "q0" accepting=False
+_LOCATION_RE = re.compile(r'(\d+)\s+"([^"]+)"\s+accepting=(True|False)')
+#   0 -> 1 : tau=[1,2], E={0,2}
+_TRANSITION_RE = re.compile(
+    r"(-?\d+)\s*->\s*(-?\d+)\s*:\s*tau=\[([^\]]*)\],\s*E=\{([^}]*)\}"
+)
+
+
+@functools.lru_cache(maxsize=1024)
+def _mask_to_indices(mask: int) -> FrozenSet[int]:
+    """The set of positions whose bits are set in mask, shared between transitions."""
+    return frozenset(i for i in range(mask.bit_length()) if mask >> i & 1)
+
 
 class Transition:
     """Represents a transition (p, τ, E, q) in a Register Automaton."""
 
+    __slots__ = (
+        "source",
+        "tau",
+        "indices_to_remove",
+        "target",
+        "indices_to_keep",
+        "_rem_mask",
+        "_hash",
+        "_tau_len",
+        "_tau_type",
+        "_rem_str",
+        "_repr",
+    )
+
     def __init__(
-        self, source: int, tau: LetterSeq, indices_to_remove: Set[int], target: int
+        self, source: int, tau: LetterSeq, indices_to_remove: Union[Set[int], int], target: int
     ):
         if not isinstance(tau, LetterSeq):
             raise TypeError("τ must be a LetterSeq")
 
         self.source: int = source
         self.tau: LetterSeq = tau
-        self.indices_to_remove: Set[int] = set(indices_to_remove)
+        # E is given either as a set of indices or as a bitmask over the indices
+        if isinstance(indices_to_remove, int):
+            self._rem_mask: int = indices_to_remove
+            self.indices_to_remove: FrozenSet[int] = _mask_to_indices(indices_to_remove)
+        else:
+            self.indices_to_remove = frozenset(indices_to_remove)
+            self._rem_mask = sum(1 << i for i in self.indices_to_remove)
         self.target: int = target
+        # positions of τ that stay in the registers, i.e., those not in E
+        self.indices_to_keep: Tuple[int, ...] = tuple(
+            i for i in range(len(tau)) if i not in self.indices_to_remove
+        )
+        # transitions are not modified once built: precompute the hash
+        self._hash: int = hash((source, target, tau, self._rem_mask))
+        self._tau_len: int = len(tau)
+        self._tau_type: Optional[str] = tau.letter_type
+        # E as written by the exporters, e.g. "{0,2}" or "{}"
+        self._rem_str: str = "{" + ",".join(map(str, sorted(self.indices_to_remove))) + "}"
+        # built by __repr__ on first use
+        self._repr: Optional[str] = None
 
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, Transition):
             return NotImplemented
         return (
-            self.source == other.source
+            self._hash == other._hash
+            and self.source == other.source
             and self.target == other.target
+            and self._rem_mask == other._rem_mask
             and self.tau == other.tau
-            and self.indices_to_remove == other.indices_to_remove
         )
 
     def __hash__(self):
-        return hash(
-            (self.source, self.target, self.tau, frozenset(self.indices_to_remove))
-        )
+        return self._hash
 
     def __repr__(self) -> str:
-        indices_str = (
-            "{" + ",".join(map(str, sorted(self.indices_to_remove))) + "}"
-            if self.indices_to_remove
-            else "∅"
-        )
-        return (
-            f"Transition({self.source} → {self.target}, τ={self.tau}, E={indices_str})"
-        )
+        if self._repr is None:
+            indices_str = self._rem_str if self.indices_to_remove else "∅"
+            self._repr = (
+                f"Transition({self.source} → {self.target}, τ={self.tau}, E={indices_str})"
+            )
+        return self._repr
 
 
 class Location:
     """A location (state) in a Register Automaton."""
 
+    __slots__ = ("id", "name", "accepting", "transitions", "_transition_set", "transitions_by_key")
+
     def __init__(self, loc_id: int, name: str, accepting: bool = False):
         self.id: int = loc_id
         self.name: str = name
         self.accepting: bool = accepting
         self.transitions: List[Transition] = []
+        # the same transitions, for constant-time duplicate checks
+        self._transition_set: Set[Transition] = set()
+        # the same transitions, grouped by the length and letter type of τ
+        self.transitions_by_key: Dict[Tuple[int, Optional[str]], List[Transition]] = {}
 
     def add_transition(
-        self, source: int, tau: LetterSeq, indices_to_remove: Set[int], target: int
+        self, source: int, tau: LetterSeq, indices_to_remove: Union[Set[int], int], target: int
     ) -> None:
         """Adds a transition if it does not already exist."""
         if source != self.id:
@@ -69,8 +120,12 @@ class Location:
             )
 
         new_transition = Transition(source, tau, indices_to_remove, target)
-        if new_transition not in self.transitions:
+        if new_transition not in self._transition_set:
+            self._transition_set.add(new_transition)
             self.transitions.append(new_transition)
+            self.transitions_by_key.setdefault(
+                (new_transition._tau_len, new_transition._tau_type), []
+            ).append(new_transition)
 
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, Location):
@@ -81,6 +136,13 @@ class Location:
         return hash(self.id)
 
     def __repr__(self) -> str:
+        return (
+            f"Location({self.id}, name={self.name}, accepting={self.accepting}, "
+            f"n_trans={len(self.transitions)})"
+        )
+
+    def dump(self) -> str:
+        """Return the location followed by its transitions, one per line."""
         header = f"Location({self.id}, name={self.name}, accepting={self.accepting})"
         transitions_str = "\n".join(f"  {t}" for t in self.transitions)
         return f"{header}\n{transitions_str}"
@@ -92,6 +154,15 @@ class Location:
 # A configuration is (location_id, register_values, last_transition)
 Configuration = Tuple[int, LetterSeq, Optional[Transition]]
 
+# A node of the run trie: the configuration after a letter (None if no
+# transition is enabled) and the nodes of the letters that may follow
+Run_Node = Tuple[Optional[Configuration], Dict[Letter, "Run_Node"]]
+
+Step_Key = Tuple[
+    str,  # letter type of τ
+    Tuple[int, ...],  # type signature of τ
+]
+
 
 class RegisterAutomaton:
     """A Register Automaton over dense alphabets (ℚ or ℝ)."""
@@ -100,6 +171,34 @@ class RegisterAutomaton:
         self.locations: Dict[int, Location] = {}
         self.initial: Optional[int] = None
         self.alphabet: Alphabet = alphabet
+        # configurations reached by earlier runs, as a trie over input letters;
+        # this is the only store of runs, cleared whenever the structure changes
+        # or the comparator differs from _run_comparator, the one it was built with
+        self._run_trie: Dict[Letter, Run_Node] = {}
+        self._run_comparator: Optional[Callable[[Numeric, Numeric], bool]] = None
+        # transitions indexed by the type of τ, built by _compile() on demand
+        # for the comparator in _step_comparator (None: not built yet);
+        # a list indexed by location id when the ids are dense
+        self._step_table: Optional[
+            Union[List[Dict[Step_Key, Transition]], Dict[int, Dict[Step_Key, Transition]]]
+        ] = None
+        self._step_comparator: Optional[Callable[[Numeric, Numeric], bool]] = None
+        # sink rejecting locations, computed by get_sink_rejecting_locations() on demand
+        self._sink_rejecting: Optional[Set[int]] = None
+        # steps to acceptance per location, computed by get_accepting_distances() on demand
+        self._accepting_distances: Optional[Dict[int, int]] = None
+        # exported text and DOT, computed by to_text() and to_dot() on demand
+        self._text_cache: Optional[str] = None
+        self._dot_cache: Optional[str] = None
+
+    def _structure_changed(self) -> None:
+        """Drop everything derived from the locations and transitions."""
+        self._run_trie.clear()
+        self._step_comparator = None
+        self._sink_rejecting = None
+        self._accepting_distances = None
+        self._text_cache = None
+        self._dot_cache = None
 
     # -------------------------------
     #       STRUCTURE MANAGEMENT
@@ -119,17 +218,33 @@ class RegisterAutomaton:
         if loc_id in self.locations:
             raise ValueError(f"Location with ID {loc_id} already exists")
         self.locations[loc_id] = Location(loc_id, name, accepting)
+        self._structure_changed()
 
     def add_transition(
-        self, source: int, tau: LetterSeq, indices_to_remove: Set[int], target: int
+        self, source: int, tau: LetterSeq, indices_to_remove: Union[Set[int], int], target: int
     ) -> None:
         self._check_location_exists(source)
         self._check_location_exists(target)
         self.locations[source].add_transition(source, tau, indices_to_remove, target)
+        self._structure_changed()
+
+    def add_transitions(
+        self, transitions: Iterable[Tuple[int, LetterSeq, Union[Set[int], int], int]]
+    ) -> None:
+        """Add transitions given as (source, τ, E, target) tuples in one call."""
+        locations = self.locations
+        try:
+            for source, tau, indices_to_remove, target in transitions:
+                self._check_location_exists(source)
+                self._check_location_exists(target)
+                locations[source].add_transition(source, tau, indices_to_remove, target)
+        finally:
+            self._structure_changed()
 
     def set_initial(self, loc_id: int) -> None:
         self._check_location_exists(loc_id)
         self.initial = loc_id
+        self._structure_changed()
 
     def get_initial(self) -> int:
         return self.initial
@@ -137,6 +252,7 @@ class RegisterAutomaton:
     def set_final(self, loc_id: int) -> None:
         self._check_location_exists(loc_id)
         self.locations[loc_id].accepting = True
+        self._structure_changed()
     
     def get_num_states(self) -> int:
         return len(self.locations)
@@ -158,51 +274,171 @@ class RegisterAutomaton:
         location_id, register_seq, _ = configuration
         extended_seq = register_seq.append(letter)
 
-        for transition in self.locations[location_id].transitions:
-            if len(extended_seq) != len(transition.tau):
-                continue
-            if extended_seq.letter_type != transition.tau.letter_type:
-                continue
-            if self.alphabet.test_type(extended_seq, transition.tau):
-                new_register_seq = extended_seq.remove_by_indices(
-                    transition.indices_to_remove
+        if self._step_comparator is not self.alphabet.comparator:
+            self._compile()
+        table = self._step_table
+        if table is not None:
+            # τ matches iff it has the same type as the extended registers
+            transition = table[location_id].get(
+                (
+                    extended_seq.letter_type,
+                    self.alphabet.get_type_signature(extended_seq),
                 )
+            )
+            if transition is None:
+                return None  # no valid transition
+            new_register_seq = extended_seq.keep_by_indices(transition.indices_to_keep)
+            return (transition.target, new_register_seq, transition)
+
+        # only transitions whose τ has the length and letter type of extended_seq
+        candidates = self.locations[location_id].transitions_by_key.get(
+            (len(extended_seq), extended_seq.letter_type), ()
+        )
+        test_type = self.alphabet.test_type
+        for transition in candidates:
+            if test_type(extended_seq, transition.tau):
+                new_register_seq = extended_seq.keep_by_indices(transition.indices_to_keep)
                 return (transition.target, new_register_seq, transition)
 
         return None  # no valid transition
 
+    def _compile(self) -> None:
+        """
+        Index the transitions of every location by the letter type and the
+        type signature of τ, so that step() finds the enabled transition with
+        one lookup. Only the first transition of each key is kept, which is
+        the one a linear scan would pick. Type signatures are only defined
+        for < and =; with other comparators step() scans the transitions.
+        """
+        comparator = self.alphabet.comparator
+        self._step_comparator = comparator
+        if comparator != comp_lt and comparator != comp_id:
+            self._step_table = None
+            return
+
+        table: Dict[int, Dict[Step_Key, Transition]] = {}
+        for loc_id, loc in self.locations.items():
+            by_key: Dict[Step_Key, Transition] = {}
+            for t in loc.transitions:
+                key = (t._tau_type, self.alphabet.get_type_signature(t.tau))
+                by_key.setdefault(key, t)
+            table[loc_id] = by_key
+        # location ids are usually 0..n-1, then a list indexes them directly
+        if all(loc_id == i for i, loc_id in enumerate(sorted(table))):
+            self._step_table = [table[i] for i in range(len(table))]
+        else:
+            self._step_table = table
+
+    def _get_run_trie(self) -> Dict[Letter, Run_Node]:
+        """
+        Return the root of the run trie, emptied first if the comparator has
+        changed since its steps were taken. Runs check this before walking
+        the trie, so no walk holds nodes of a trie that gets cleared.
+        """
+        comparator = self.alphabet.comparator
+        if self._run_comparator is not comparator:
+            self._run_trie.clear()
+            self._run_comparator = comparator
+        return self._run_trie
+
     def run(self, input_seq: LetterSeq) -> List[Configuration]:
-        """Simulate the automaton on an input alphabet."""
+        """
+        Simulate the automaton on an input alphabet.
+        The steps are memoised in a trie shared by all runs, so only the
+        letters past the longest prefix seen before are stepped.
+        """
         if self.initial is None:
             raise ValueError("Initial location not set")
 
-        configurations: List[Configuration] = [
-            (self.initial, self.alphabet.empty_sequence(), None)
-        ]
+        configurations = [(self.initial, self.alphabet.empty_sequence(), None)]
         current = configurations[0]
 
+        # follow the trie of steps taken by earlier runs, stepping only where
+        # this input leaves it; a None configuration marks a blocked step
+        step = self.step
+        append = configurations.append
+        children = self._get_run_trie()
         for letter in input_seq.letters:
-            next_config = self.step(current, letter)
+            node = children.get(letter)
+            if node is None:
+                node = children[letter] = (step(current, letter), {})
+            next_config, children = node
             if next_config is None:
                 break
-            configurations.append(next_config)
+            append(next_config)
             current = next_config
 
         return configurations
 
     def is_accepted(self, input_seq: LetterSeq) -> bool:
         """Check whether the automaton accepts the given alphabet."""
-        configs = self.run(input_seq)
-        final_location_id, _, _ = configs[-1]
-        return self.locations[final_location_id].accepting
+        if self.initial is None:
+            raise ValueError("Initial location not set")
+
+        # follow the run trie like run(), without building the list of configurations
+        current = (self.initial, self.alphabet.empty_sequence(), None)
+        children = self._get_run_trie()
+        remaining = len(input_seq)
+        for letter in input_seq.letters:
+            node = children.get(letter)
+            if node is None:
+                # no need to step on if acceptance is out of reach with the letters left
+                distance = self.get_accepting_distances().get(current[0])
+                if distance is None or distance > remaining:
+                    return False
+                node = children[letter] = (self.step(current, letter), {})
+            next_config, children = node
+            if next_config is None:
+                break
+            current = next_config
+            remaining -= 1
+        return self.locations[current[0]].accepting
 
     def get_sink_rejecting_locations(self) -> Set[int]:
-        """Return the IDs of all sink rejecting locations."""
-        sink_rejecting_ids = set()
-        for loc_id, loc in self.locations.items():
-            if not loc.accepting and all(t.target == loc_id for t in loc.transitions):
-                sink_rejecting_ids.add(loc_id)
-        return sink_rejecting_ids
+        """
+        Return the IDs of all sink rejecting locations.
+        The set is cached until the automaton changes and must not be modified.
+        """
+        if self._sink_rejecting is None:
+            sink_rejecting_ids = set()
+            for loc_id, loc in self.locations.items():
+                if loc.accepting:
+                    continue
+                # a sink only has self-loops; stop at the first edge leaving it
+                is_sink = True
+                for t in loc.transitions:
+                    if t.target != loc_id:
+                        is_sink = False
+                        break
+                if is_sink:
+                    sink_rejecting_ids.add(loc_id)
+            self._sink_rejecting = sink_rejecting_ids
+        return self._sink_rejecting
+
+    def get_accepting_distances(self) -> Dict[int, int]:
+        """
+        Return, for each location from which an accepting location is
+        reachable ignoring the guards, the least number of letters needed to
+        reach one. A run in a location missing from the dict, or farther from
+        acceptance than the letters left, is rejected.
+        The dict is cached until the automaton changes and must not be modified.
+        """
+        if self._accepting_distances is None:
+            predecessors: Dict[int, Set[int]] = {loc_id: set() for loc_id in self.locations}
+            for loc_id, loc in self.locations.items():
+                for t in loc.transitions:
+                    predecessors[t.target].add(loc_id)
+            # backward breadth-first search from the accepting locations
+            distances = {loc_id: 0 for loc_id, loc in self.locations.items() if loc.accepting}
+            queue = deque(distances)
+            while queue:
+                loc_id = queue.popleft()
+                for pred in predecessors[loc_id]:
+                    if pred not in distances:
+                        distances[pred] = distances[loc_id] + 1
+                        queue.append(pred)
+            self._accepting_distances = distances
+        return self._accepting_distances
 
     def get_normalised_dra(self) -> "RegisterAutomaton":
         """
@@ -217,10 +453,12 @@ class RegisterAutomaton:
         rejecting_sinks = self.get_sink_rejecting_locations()
         chosen_sink = next(iter(rejecting_sinks), -1)
 
-        missing_a_map: Dict[int, Set[Letter]] = {}
+        missing_a_map: Dict[int, FrozenSet[Letter]] = {}
         canonical_u_map: Dict[int, LetterSeq] = {}
+        expected_a_map: Dict[LetterSeq, FrozenSet[Letter]] = {}
 
         normalised = RegisterAutomaton(self.alphabet)
+        is_equality = self.alphabet.comparator == comp_id
 
         # copy locations
         for loc in self.locations.values():
@@ -233,9 +471,28 @@ class RegisterAutomaton:
             if loc.id in rejecting_sinks:
                 continue
             # print("Normalising location", loc.id, "================================")
-            original_u = None  # u in original letters
-            canonical_u = None  # u in canonical 0,1,2,... letters
+            # all outgoing transitions share u up to its type, so u is
+            # canonicalised once, from the first transition
+            if loc.transitions:
+                first_tau = loc.transitions[0].tau
+                if len(first_tau) == 0:
+                    raise Exception("Transition has empty τ")
+                original_u = first_tau.get_prefix(len(first_tau) - 1)  # u in original letters
+            else:
+                original_u = self.alphabet.empty_sequence()
+            # Canonicalise u: sorted unique letters -> index mapping
+            # in theory, u can not contain duplicates, but we handle it anyway
+            # (on values, so that bisect compares numbers rather than Letters)
+            u_sorted = original_u.get_distinct_values()
+            value_to_idx = {v: i for i, v in enumerate(u_sorted)}
+            # print("u_sorted", u_sorted)
+            # print("value_to_idx", value_to_idx)
+            # Build canonical u, i.e., u in canonical 0,1,2,... letters
+            u_indices = [value_to_idx[v] for v in original_u.values]
+            canonical_u = self.alphabet.make_sequence(u_indices)
             used_a: Set[Letter] = set()
+            # prefixes already known to be of the same type as original_u
+            checked_u: Set[LetterSeq] = {original_u}
 
             for trans in loc.transitions:
                 tau = trans.tau
@@ -247,56 +504,46 @@ class RegisterAutomaton:
                 a_orig = tau.letters[-1]  # a (original)
 
                 # Check shared u assumption
-                if original_u is None:
-                    original_u = u_orig
-                else:
+                if u_orig not in checked_u:
                     if not self.alphabet.test_type(u_orig, original_u):
                         raise Exception(
                             f"Location {loc.id}: outgoing transitions do not share memorable prefix u of the same type"
                         )
-                # Canonicalise u: sorted unique letters -> index mapping
-                # in theory, u can not contain duplicates, but we handle it anyway
-                u_sorted = sorted(set(original_u.letters), key=lambda x: x.value)
-                letter_to_idx = {letter: i for i, letter in enumerate(u_sorted)}
-                # print("u_sorted", u_sorted)
-                # print("letter_to_idx", letter_to_idx)
-                # Build canonical u
-                u_indices = [letter_to_idx[x] for x in original_u.letters]
-                canonical_u = self.alphabet.make_sequence(u_indices)
-                
+                    checked_u.add(u_orig)
+
                 # ignore all transitions to sink
-                # since we will make new ones, 
-                # NOTE: we still wants it 
-                # to compute the canonical_u
+                # since we will make new ones
                 if trans.target in rejecting_sinks:
                     continue
                 # print("canonical u", canonical_u)
-                # Canonicalise a via bisect_left over u
-                # the index gives the position in the sorted unique letters
-                insert_pos = bisect.bisect_right(u_sorted, a_orig)
-                a_canon = None
-                if len(u_sorted) <= 0:
+                # Canonicalise a via its position among the sorted unique letters of u
+                a_value = a_orig.value
+                a_idx = value_to_idx.get(a_value)
+                if not u_sorted:
                     # for empty memorable sequence, we only input 0
-                    a_canon = self.alphabet.make_letter(0)
-                elif a_orig in letter_to_idx:
+                    canon_value = 0
+                elif a_idx is not None:
                     # a is in u
-                    a_canon = self.alphabet.make_letter(letter_to_idx[a_orig])
+                    canon_value = a_idx
                 # from here, a not in u and u is not empty
-                elif self.alphabet.comparator == comp_id:
+                elif is_equality:
                     # equality comparator and a not in u
                     # only need to add a that is greater than all in u
-                    a_canon = self.alphabet.make_letter(len(u_sorted))
-                # from here, comparator is < and a not in u
-                elif insert_pos == 0:
-                    # a is smaller than all memorable letters
-                    a_canon = self.alphabet.make_letter(-1)
-                elif insert_pos >= len(u_sorted):
-                    # a is greater than all memorable letters
-                    a_canon = self.alphabet.make_letter(len(u_sorted))
+                    canon_value = len(u_sorted)
                 else:
-                    # in between two letters, but smaller than u[insert_pos]
-                    a_canon = self.alphabet.make_letter(insert_pos - 0.5)
-                    
+                    # comparator is < and a not in u
+                    insert_pos = bisect.bisect_right(u_sorted, a_value)
+                    if insert_pos == 0:
+                        # a is smaller than all memorable letters
+                        canon_value = -1
+                    elif insert_pos >= len(u_sorted):
+                        # a is greater than all memorable letters
+                        canon_value = len(u_sorted)
+                    else:
+                        # in between two letters, but smaller than u[insert_pos]
+                        canon_value = insert_pos - 0.5
+                a_canon = self.alphabet.make_letter(canon_value)
+
                 used_a.add(a_canon)
                 # Construct canonical τ
                 tau_canon = canonical_u.append(a_canon)
@@ -305,12 +552,18 @@ class RegisterAutomaton:
                     trans.source, tau_canon, trans.indices_to_remove, trans.target
                 )
                 
-            # adhere to letter extensions for memorable letters
-            expected_a = set(canonical_u.get_letter_extension(self.alphabet.comparator).letters)
-            missing_a = expected_a - used_a
-
-            if missing_a:
-                missing_a_map[loc.id] = missing_a
+            # adhere to letter extensions for memorable letters;
+            # locations with the same canonical u share them
+            expected_a = expected_a_map.get(canonical_u)
+            if expected_a is None:
+                expected_a = frozenset(
+                    canonical_u.get_letter_extension(self.alphabet.comparator).letters
+                )
+                expected_a_map[canonical_u] = expected_a
+            # canonical letters always belong to the extension,
+            # so nothing is missing when all of them are used
+            if len(used_a) < len(expected_a):
+                missing_a_map[loc.id] = expected_a - used_a
 
             canonical_u_map[loc.id] = canonical_u
 
@@ -329,18 +582,16 @@ class RegisterAutomaton:
             # Add transitions to sink for missing a letters
             for loc_id, missing_a_letters in missing_a_map.items():
                 u_canon = canonical_u_map[loc_id]
-                loc = normalised.locations[loc_id]
 
                 for a in missing_a_letters:
                     tau_to_sink = u_canon.append(a)
-                    indices_to_remove = set(range(len(tau_to_sink)))
-                    loc.add_transition(loc_id, tau_to_sink, indices_to_remove, sink_id)
+                    # the sink forgets all registers
+                    indices_to_remove = (1 << len(tau_to_sink)) - 1
+                    normalised.add_transition(loc_id, tau_to_sink, indices_to_remove, sink_id)
 
             # Sink self-loop
             loop_tau = self.alphabet.make_sequence([0])
-            normalised.locations[sink_id].add_transition(
-                    sink_id, loop_tau, {0}, sink_id
-                )
+            normalised.add_transition(sink_id, loop_tau, 0b1, sink_id)
 
         return normalised
 
@@ -350,6 +601,8 @@ class RegisterAutomaton:
 
     def to_dot(self) -> str:
         """Return a Graphviz DOT representation of the automaton."""
+        if self._dot_cache is not None:
+            return self._dot_cache
         lines = [
             "digraph RegisterAutomaton {",
             "  rankdir=LR;",
@@ -370,20 +623,15 @@ class RegisterAutomaton:
         # transitions
         for loc in self.locations.values():
             for t in loc.transitions:
-                tau_str = str(t.tau)
-                e_str = (
-                    "{" + ",".join(map(str, sorted(t.indices_to_remove))) + "}"
-                    if t.indices_to_remove
-                    else "{}"
-                )
-                label = f"{tau_str}, E={e_str}"
+                label = f"{t.tau}, E={t._rem_str}"
                 lines.append(f'  {t.source} -> {t.target} [label="{label}"];')
 
         lines.append("}")
-        return "\n".join(lines)
+        self._dot_cache = "\n".join(lines)
+        return self._dot_cache
 
     def __repr__(self) -> str:
-        content = "\n".join(f"  {loc}" for loc in self.locations.values())
+        content = "\n".join(f"  {loc.dump()}" for loc in self.locations.values())
         return f"RegisterAutomaton(\n{content}\n)"
 
     # -------------------------------
@@ -391,31 +639,44 @@ class RegisterAutomaton:
     # -------------------------------
     def to_text(self) -> str:
         """Return a human-readable text representation."""
-        lines = []
-        lines.append("# Register Automaton")
+        if self._text_cache is None:
+            self._text_cache = "\n".join(self._text_lines())
+        return self._text_cache
+
+    def iter_text_lines(self) -> Iterator[str]:
+        """
+        Yield the text representation of to_text() line by line, for writing
+        it out without building the whole string; "".join() of the lines
+        equals to_text().
+        """
+        if self._text_cache is not None:
+            yield self._text_cache
+            return
+        separator = ""
+        for line in self._text_lines():
+            yield separator + line
+            separator = "\n"
+
+    def _text_lines(self) -> Iterator[str]:
+        """The lines of the text representation, without line breaks."""
+        yield "# Register Automaton"
         # Alphabet: show ordering or equality comparator
         if self.alphabet.comparator == comp_lt:
             comp_str = "<"
         else:
             comp_str = "="
-        lines.append(f"alphabet: {self.alphabet.letter_type}, {comp_str}")
-        lines.append(f"initial: {self.initial}")
+        yield f"alphabet: {self.alphabet.letter_type}, {comp_str}"
+        yield f"initial: {self.initial}"
 
-        lines.append("locations:")
+        yield "locations:"
         for loc_id, loc in self.locations.items():
-            lines.append(f'  {loc_id} "{loc.name}" accepting={loc.accepting}')
+            yield f'  {loc_id} "{loc.name}" accepting={loc.accepting}'
 
-        lines.append("\ntransitions:")
+        yield "\ntransitions:"
         for loc in self.locations.values():
             for t in loc.transitions:
-                tau_str = ",".join(str(l.value) for l in t.tau.letters)
-                if t.indices_to_remove:
-                    e_str = "{" + ",".join(map(str, sorted(t.indices_to_remove))) + "}"
-                else:
-                    e_str = "{}"
-                lines.append(f"  {t.source} -> {t.target} : tau=[{tau_str}], E={e_str}")
-
-        return "\n".join(lines)
+                tau_str = ",".join(map(str, t.tau.values))
+                yield f"  {t.source} -> {t.target} : tau=[{tau_str}], E={t._rem_str}"
 
     # -------------------------------
     #          TEXT PARSING
@@ -477,7 +738,7 @@ class RegisterAutomaton:
 
         while i < len(lines) and not lines[i].startswith("transitions"):
             # Format: "<id> <name> accepting=<bool>"
-            m = re.match(r'(\d+)\s+"([^"]+)"\s+accepting=(True|False)', lines[i])
+            m = _LOCATION_RE.match(lines[i])
             if not m:
                 raise ValueError(f"Cannot parse location line: {lines[i]}")
 
@@ -495,43 +756,25 @@ class RegisterAutomaton:
             raise ValueError("Expected 'transitions:' section")
         i += 1
 
+        # letters are parsed by the alphabet's number type
+        parse_value = float if alphabet.letter_type == LetterType.REAL else Fraction
         while i < len(lines):
             # Example line:
             #   0 -> 1 : tau=[1,2], E={0,2}
-            line = lines[i]
-            left, right = line.split(":")
-            left = left.strip()
-            right = right.strip()
-
-            # Parse "0 -> 1"
-            src_str, _, tgt_str = left.split()
-            src, tgt = int(src_str), int(tgt_str)
-
-            # Parse tau list
-            tau_part, e_part = right.split(", E=")
-            tau_str = tau_part.split("=", 1)[1].strip()
-            tau_str = tau_str[1:-1]  # remove [ ]
-
-            if tau_str:
-                x_strs = [x.strip() for x in tau_str.split(",")]
-                x_values = [
-                    float(x) if alphabet.letter_type == LetterType.REAL else Fraction(x)
-                    for x in x_strs
-                ]
-                tau_letters = [alphabet.make_letter(x) for x in x_values]
-            else:
-                tau_letters = []
+            m = _TRANSITION_RE.match(lines[i])
+            if not m:
+                raise ValueError(f"Cannot parse transition line: {lines[i]}")
 
-            tau = alphabet.form_sequence(tau_letters)
+            src, tgt = int(m.group(1)), int(m.group(2))
 
-            # Parse E-set
-            e_str = e_part.strip()
-            e_str = e_str[1:-1]  # remove { }
+            # Parse tau list (int(), float() and Fraction() ignore surrounding spaces)
+            tau_str = m.group(3).strip()
+            tau_values = list(map(parse_value, tau_str.split(","))) if tau_str else []
+            tau = alphabet.make_sequence(tau_values)
 
-            if e_str:
-                indices_to_remove = {int(x) for x in e_str.split(",")}
-            else:
-                indices_to_remove = set()
+            # Parse E-set
+            e_str = m.group(4).strip()
+            indices_to_remove = frozenset(map(int, e_str.split(","))) if e_str else frozenset()
 
             # Add transition
             ra.add_transition(
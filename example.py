@@ -83,21 +83,24 @@ def solve_memorability_query_1(target: dra.RegisterAutomaton, u: alphabet.Letter
         return target.get_alphabet().empty_sequence()
     
 def solve_memorability_query_2(target: dra.RegisterAutomaton, u: alphabet.LetterSeq):
-    if len(u.letters) <= 0:
+    n = len(u)
+    if n <= 0:
         return target.alphabet.empty_sequence()
-    if len(u.letters) == 1:
+    if n == 1:
         return u
-    if len(u.letters) == 2:
-        if u.letters[0] != u.letters[1]:
+    # letters of one sequence share their type, so comparing the cached values suffices
+    values = u.values
+    if n == 2:
+        if values[0] != values[1]:
             return u
         else:
             return target.alphabet.empty_sequence()
-    if len(u.letters) == 3:
-        if u.letters[0] != u.letters[1] and u.letters[0] == u.letters[2]:
+    if n == 3:
+        if values[0] != values[1] and values[0] == values[2]:
             return u.get_suffix(1)
         else:
             return target.alphabet.empty_sequence()
-    if len(u.letters) == 4:
+    if n == 4:
         is_accepted = target.is_accepted(u)
         if is_accepted:
             return target.alphabet.empty_sequence()
@@ -42,6 +42,11 @@ def generate_ln_automaton(n: int) -> RegisterAutomaton:
     ra.add_location(0, "[]", accepting=False)
     ra.set_initial(0)
     
+    # Labels of the path states, i.e., their last register value:
+    # (i-1).0 on the increasing path, -(i-n).0 on the decreasing path
+    inc_labels = [f"[{float(i - 1):.1f}]" for i in range(1, n + 1)]
+    dec_labels = [f"[{float(-(i - n)):.1f}]" for i in range(n + 1, 2 * n - 1)]
+    
     # Add increasing path states (1 to n)
     # State i has label [last_value] where last_value = (i-1).0
     # State n (accepting) has empty register []
@@ -55,17 +60,14 @@ def generate_ln_automaton(n: int) -> RegisterAutomaton:
             label = "[]"
         else:
             # Label is just the last value in the register: [(i-1).0]
-            last_val = float(i - 1)
-            label = f"[{last_val:.1f}]"
+            label = inc_labels[i - 1]
         ra.add_location(i, label, accepting=accepting)
     
     # Add decreasing path states (n+1 to 2n-2)
     # State i has label [last_value] where last_value = -(i-n).0
     for i in range(n + 1, 2 * n - 1):
         # Label is just the last value in the register: [-(i-n).0]
-        last_val = float(-(i - n))
-        label = f"[{last_val:.1f}]"
-        ra.add_location(i, label, accepting=False)
+        ra.add_location(i, dec_labels[i - n - 1], accepting=False)
     
     # Add sink state
     # For n=1, sink is state 2 (since state 1 is accepting)
@@ -76,14 +78,18 @@ def generate_ln_automaton(n: int) -> RegisterAutomaton:
         sink_state = 2 * n - 1
     ra.add_location(sink_state, "sink", accepting=False)
     
+    # Transitions are collected as (source, tau, E, target) and added in one call;
+    # E is given as a bitmask over the positions of tau, e.g. 0b11 for {0,1}
+    transitions = []
+    
     # Transitions from initial state (0)
     tau_initial_inc = alphabet.make_sequence([0.0])
     if n == 1:
         # Special case: n=1, transition to accepting state with E={0} to store the value
-        ra.add_transition(0, tau_initial_inc, {0}, 1)
+        transitions.append((0, tau_initial_inc, 0b1, 1))
     else:
         # Normal case: 0 -> 1 with tau=[0.0], E={}
-        ra.add_transition(0, tau_initial_inc, set(), 1)
+        transitions.append((0, tau_initial_inc, 0, 1))
     
     # Transitions in increasing path (1 to n-1)
     # For n=1, this loop is empty (range(1, 1) is empty)
@@ -97,19 +103,19 @@ def generate_ln_automaton(n: int) -> RegisterAutomaton:
         tau_inc = alphabet.make_sequence([last_val, next_val])
         if i + 1 == n:
             # Transition to accepting state: E contains all positions {0,1}
-            ra.add_transition(i, tau_inc, {0, 1}, i + 1)
+            transitions.append((i, tau_inc, 0b11, i + 1))
         else:
             # Intermediate transition: E={0}
-            ra.add_transition(i, tau_inc, {0}, i + 1)
+            transitions.append((i, tau_inc, 0b1, i + 1))
         
         # Invalid: equal values go to sink: tau=[last_val, last_val], E={0,1}
         tau_eq = alphabet.make_sequence([last_val, last_val])
-        ra.add_transition(i, tau_eq, {0, 1}, sink_state)
+        transitions.append((i, tau_eq, 0b11, sink_state))
         
         # Invalid: decreasing goes to sink: tau=[last_val, last_val-1], E={0,1}
         if i > 1:
             tau_dec = alphabet.make_sequence([last_val, last_val - 1.0])
-            ra.add_transition(i, tau_dec, {0, 1}, sink_state)
+            transitions.append((i, tau_dec, 0b11, sink_state))
     
     # From state 1, can also start decreasing path (only for n > 1)
     if n > 1:
@@ -117,20 +123,20 @@ def generate_ln_automaton(n: int) -> RegisterAutomaton:
         if n == 2:
             # Special case: n=2 has no decreasing path states, go directly to accepting state
             # tau=[0.0,-1.0] with E={0,1} clears both values to get empty register
-            ra.add_transition(1, tau_start_dec, {0, 1}, n)
+            transitions.append((1, tau_start_dec, 0b11, n))
         else:
             # Normal case: go to first decreasing path state n+1 with E={0}
-            ra.add_transition(1, tau_start_dec, {0}, n + 1)
+            transitions.append((1, tau_start_dec, 0b1, n + 1))
         
         # Invalid from state 1: equal values go to sink
         tau_1_eq = alphabet.make_sequence([0.0, 0.0])
-        ra.add_transition(1, tau_1_eq, {0, 1}, sink_state)
+        transitions.append((1, tau_1_eq, 0b11, sink_state))
     
     # Transitions from accepting increasing state (n)
     # For n=1, state 1 is accepting and any further input goes to sink
     # For n>1, state n has empty register [] and any further input goes to sink
     tau_any = alphabet.make_sequence([0.0])
-    ra.add_transition(n, tau_any, {0}, sink_state)
+    transitions.append((n, tau_any, 0b1, sink_state))
     
     # Transitions in decreasing path (n+1 to 2n-3, excluding last state 2n-2)
     for i in range(n + 1, 2 * n - 2):
@@ -141,15 +147,15 @@ def generate_ln_automaton(n: int) -> RegisterAutomaton:
         
         # Valid: continue decreasing: i -> i+1 with tau=[last_val, next_val], E={0}
         tau_dec = alphabet.make_sequence([last_val, next_val])
-        ra.add_transition(i, tau_dec, {0}, i + 1)
+        transitions.append((i, tau_dec, 0b1, i + 1))
         
         # Invalid: equal values go to sink: tau=[last_val, last_val], E={0,1}
         tau_eq = alphabet.make_sequence([last_val, last_val])
-        ra.add_transition(i, tau_eq, {0, 1}, sink_state)
+        transitions.append((i, tau_eq, 0b11, sink_state))
         
         # Invalid: increasing goes to sink: tau=[last_val, last_val+1], E={0,1}
         tau_inc = alphabet.make_sequence([last_val, last_val + 1.0])
-        ra.add_transition(i, tau_inc, {0, 1}, sink_state)
+        transitions.append((i, tau_inc, 0b11, sink_state))
     
     # Transitions from last decreasing state (2n-2) 
     # State 2n-2 has register [0.0, -1.0, ..., -(n-2).0]
@@ -162,18 +168,19 @@ def generate_ln_automaton(n: int) -> RegisterAutomaton:
         
         # Valid: continue decreasing to accepting state: tau=[last_val, next_val], E={0,1}
         tau_to_accepting = alphabet.make_sequence([last_val, next_val])
-        ra.add_transition(last_decreasing_state, tau_to_accepting, {0, 1}, n)
+        transitions.append((last_decreasing_state, tau_to_accepting, 0b11, n))
         
         # Invalid transitions from last decreasing state to sink
         tau_eq = alphabet.make_sequence([last_val, last_val])
-        ra.add_transition(last_decreasing_state, tau_eq, {0, 1}, sink_state)
+        transitions.append((last_decreasing_state, tau_eq, 0b11, sink_state))
         tau_inc = alphabet.make_sequence([last_val, last_val + 1.0])
-        ra.add_transition(last_decreasing_state, tau_inc, {0, 1}, sink_state)
+        transitions.append((last_decreasing_state, tau_inc, 0b11, sink_state))
     
     # Sink state: all inputs loop back to sink
     tau_sink = alphabet.make_sequence([0.0])
-    ra.add_transition(sink_state, tau_sink, {0}, sink_state)
+    transitions.append((sink_state, tau_sink, 0b1, sink_state))
     
+    ra.add_transitions(transitions)
     return ra
 
 def main():
@@ -212,10 +219,9 @@ def main():
         os.makedirs(ln_dir, exist_ok=True)
         output_file = os.path.join(ln_dir, f"L{args.n}.txt")
     
-    # Write to file
-    text_repr = ra.to_text()
+    # Write to file line by line, without building the whole text first
     with open(output_file, 'w') as f:
-        f.write(text_repr)
+        f.writelines(ra.iter_text_lines())
     
     print(f"Generated L{args.n} automaton:")
     print(f"  States: {ra.get_num_states()}")
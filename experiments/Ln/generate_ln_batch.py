@@ -1,13 +1,13 @@
 #!/usr/bin/env python3
 """
 Batch generator for Ln automata.
-Calls generate_ln.py for n = 5, 10, 15, ..., 100
+Generates Ln for n = 5, 10, 15, ..., 100 with generate_ln_automaton
 """
 
-import subprocess
-import sys
 import os
 
+from generate_ln import generate_ln_automaton
+
 def generate_ln_batch():
     """Generate Ln automata for n = 5, 10, 15, ..., 100"""
     # Values of n to generate: 5, 10, 15, ..., 100
@@ -31,30 +31,13 @@ def generate_ln_batch():
         # Output file path
         output_file = os.path.join(generated_dir, f"L{n}.txt")
         
-        # Call generate_ln.py from same directory
-        cmd = [
-            sys.executable,
-            "generate_ln.py",
-            str(n),
-            "--out", output_file
-        ]
-        
+        # Generate in this process, as a subprocess per n mostly costs interpreter startup
         try:
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                check=True,
-                timeout=60  # 1 minute timeout per automaton
-            )
+            ra = generate_ln_automaton(n)
+            with open(output_file, 'w') as f:
+                f.writelines(ra.iter_text_lines())
             print("✓")
             success_count += 1
-        except subprocess.TimeoutExpired:
-            print("✗ TIMEOUT")
-            fail_count += 1
-        except subprocess.CalledProcessError as e:
-            print(f"✗ ERROR: {e.stderr[:50] if e.stderr else 'Unknown error'}")
-            fail_count += 1
         except Exception as e:
             print(f"✗ ERROR: {str(e)[:50]}")
             fail_count += 1
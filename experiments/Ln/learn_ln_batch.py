@@ -8,10 +8,109 @@ import subprocess
 import sys
 import os
 from pathlib import Path
-import glob
 import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
-def learn_ln_batch(min_n=None, max_n=None):
+class _RunningLearners:
+    """
+    The learner subprocesses running in one batch, so that an interrupted
+    batch can stop them. Once stopped, learners are killed as they start.
+    """
+    
+    def __init__(self):
+        self._processes = set()
+        self._lock = threading.Lock()
+        self._stopped = False
+    
+    def add(self, process):
+        with self._lock:
+            self._processes.add(process)
+            if self._stopped:
+                process.kill()
+    
+    def discard(self, process):
+        with self._lock:
+            self._processes.discard(process)
+    
+    def stop(self):
+        with self._lock:
+            self._stopped = True
+            for process in self._processes:
+                process.kill()
+
+def _ln_sort_key(input_file):
+    """Sort key ordering Ln files by n; files not named Ln come last, by name."""
+    base_name = Path(input_file).stem
+    if base_name.startswith("L") and base_name[1:].isdigit():
+        return (0, int(base_name[1:]), base_name)
+    return (1, 0, base_name)
+
+def _learn_one(input_file, output_dir, learners):
+    """
+    Learn one automaton with ralt_quiet.py in a subprocess, registered in
+    learners (a _RunningLearners) while it runs.
+    
+    Returns:
+        (base_name, elapsed_time, status) where status is None on success,
+        otherwise "TIMEOUT", "ERROR" or "ERROR: <message>".
+    """
+    # Extract the base name (e.g., "L5" from "examples/Ln/L5.txt")
+    base_name = Path(input_file).stem  # Gets "L5" from "L5.txt"
+    
+    # Output files
+    log_file = os.path.join(output_dir, f"{base_name}.log")
+    learned_file = os.path.join(output_dir, f"{base_name}_learned.txt")
+    
+    # Start timing
+    start_time = time.time()
+    
+    # Get script directory and root directory
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    root_dir = os.path.dirname(os.path.dirname(script_dir))
+    
+    # Call ralt_quiet.py from root directory
+    ralt_quiet_path = os.path.join(root_dir, "ralt_quiet.py")
+    cmd = [
+        sys.executable,
+        ralt_quiet_path,
+        "--inp", input_file,
+        "--out", learned_file
+    ]
+    
+    try:
+        with open(log_file, 'w') as log_f:
+            process = subprocess.Popen(
+                cmd,
+                stdout=log_f,
+                stderr=subprocess.STDOUT,
+                text=True
+            )
+            learners.add(process)
+            try:
+                returncode = process.wait(timeout=3600)  # 1 hour timeout per automaton
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+                raise
+            finally:
+                learners.discard(process)
+        if returncode != 0:
+            raise subprocess.CalledProcessError(returncode, cmd)
+        return base_name, time.time() - start_time, None
+    except subprocess.TimeoutExpired:
+        status = "TIMEOUT"
+    except subprocess.CalledProcessError:
+        status = "ERROR"
+    except Exception as e:
+        status = f"ERROR: {str(e)[:50]}"
+    elapsed_time = time.time() - start_time
+    # Clean up partial files
+    if os.path.exists(learned_file):
+        os.remove(learned_file)
+    return base_name, elapsed_time, status
+
+def learn_ln_batch(min_n=None, max_n=None, jobs=1):
     """
     Learn all Ln automata from examples/Ln/
     
@@ -20,7 +119,12 @@ def learn_ln_batch(min_n=None, max_n=None):
                If None, no lower bound is applied.
         max_n: Maximum value of n to process (e.g., 50 means only learn L5, L10, ..., L50).
                If None, no upper bound is applied.
+        jobs: Number of automata learned in parallel; 0 or None means one per CPU.
+              Parallel runs compete for the CPU, which inflates the recorded times.
     """
+    if jobs is not None and jobs < 0:
+        raise ValueError("jobs must be non-negative")
+    
     # Input directory
     input_dir = "target-DRA"
     
@@ -28,14 +132,15 @@ def learn_ln_batch(min_n=None, max_n=None):
     output_dir = "learned-DRA"
     os.makedirs(output_dir, exist_ok=True)
     
-    # Create timing log file
-    timing_log_file = os.path.join(output_dir, "timing.log")
-    with open(timing_log_file, 'w') as f:
-        f.write("Filename\tTime (seconds)\n")
-    
-    # Find all Lx.txt files
-    pattern = os.path.join(input_dir, "L*.txt")
-    input_files = sorted(glob.glob(pattern))
+    # Find all Lx.txt files, in order of n (L2 before L10)
+    input_files = []
+    if os.path.isdir(input_dir):
+        with os.scandir(input_dir) as entries:
+            input_files = [
+                entry.path for entry in entries
+                if entry.name.startswith("L") and entry.name.endswith(".txt") and entry.is_file()
+            ]
+    input_files.sort(key=_ln_sort_key)
     
     if not input_files:
         print(f"No L*.txt files found in {input_dir}/")
@@ -74,85 +179,48 @@ def learn_ln_batch(min_n=None, max_n=None):
         print(f"Min n: {min_n}")
     if max_n is not None:
         print(f"Max n: {max_n}")
+    print(f"Jobs: {jobs or os.cpu_count()}")
     print()
     
     success_count = 0
     fail_count = 0
     total_start_time = time.time()
     
-    for input_file in input_files:
-        # Extract the base name (e.g., "L5" from "examples/Ln/L5.txt")
-        base_name = Path(input_file).stem  # Gets "L5" from "L5.txt"
-        
-        # Output files
-        log_file = os.path.join(output_dir, f"{base_name}.log")
-        learned_file = os.path.join(output_dir, f"{base_name}_learned.txt")
-        
-        print(f"Learning {base_name}...", end=" ", flush=True)
-        
-        # Start timing
-        start_time = time.time()
-        
-        # Get script directory and root directory
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        root_dir = os.path.dirname(os.path.dirname(script_dir))
-        
-        # Call ralt_quiet.py from root directory
-        ralt_quiet_path = os.path.join(root_dir, "ralt_quiet.py")
-        cmd = [
-            sys.executable,
-            ralt_quiet_path,
-            "--inp", input_file,
-            "--out", learned_file
+    # Each learner runs in its own subprocess, so threads are enough to run
+    # several at once; results are reported and logged as they complete
+    if not jobs:
+        jobs = os.cpu_count() or 1
+    
+    # Create timing log file, kept open and line buffered so that the times
+    # recorded so far survive an interrupted batch
+    timing_log_file = os.path.join(output_dir, "timing.log")
+    with open(timing_log_file, 'w', buffering=1) as timing_f, \
+            ThreadPoolExecutor(max_workers=min(jobs, len(input_files))) as executor:
+        timing_f.write("Filename\tTime (seconds)\n")
+        learners = _RunningLearners()
+        futures = [
+            executor.submit(_learn_one, input_file, output_dir, learners)
+            for input_file in input_files
         ]
-        
         try:
-            with open(log_file, 'w') as log_f:
-                result = subprocess.run(
-                    cmd,
-                    stdout=log_f,
-                    stderr=subprocess.STDOUT,
-                    text=True,
-                    check=True,
-                    timeout=3600  # 1 hour timeout per automaton
-                )
-            elapsed_time = time.time() - start_time
-            print(f"✓ ({elapsed_time:.2f}s)")
-            success_count += 1
-            
-            # Record timing
-            with open(timing_log_file, 'a') as f:
-                f.write(f"{base_name}.txt\t{elapsed_time:.2f}\n")
-        except subprocess.TimeoutExpired:
-            elapsed_time = time.time() - start_time
-            print(f"✗ TIMEOUT ({elapsed_time:.2f}s)")
-            fail_count += 1
-            # Record timeout in timing log
-            with open(timing_log_file, 'a') as f:
-                f.write(f"{base_name}.txt\tTIMEOUT ({elapsed_time:.2f}s)\n")
-            # Clean up partial files
-            if os.path.exists(learned_file):
-                os.remove(learned_file)
-        except subprocess.CalledProcessError as e:
-            elapsed_time = time.time() - start_time
-            print(f"✗ ERROR ({elapsed_time:.2f}s)")
-            fail_count += 1
-            # Record error in timing log
-            with open(timing_log_file, 'a') as f:
-                f.write(f"{base_name}.txt\tERROR ({elapsed_time:.2f}s)\n")
-            # Clean up partial files
-            if os.path.exists(learned_file):
-                os.remove(learned_file)
-        except Exception as e:
-            elapsed_time = time.time() - start_time
-            print(f"✗ ERROR: {str(e)[:50]} ({elapsed_time:.2f}s)")
-            fail_count += 1
-            # Record error in timing log
-            with open(timing_log_file, 'a') as f:
-                f.write(f"{base_name}.txt\tERROR ({elapsed_time:.2f}s)\n")
-            # Clean up partial files
-            if os.path.exists(learned_file):
-                os.remove(learned_file)
+            for future in as_completed(futures):
+                base_name, elapsed_time, status = future.result()
+                if status is None:
+                    print(f"{base_name}: ✓ ({elapsed_time:.2f}s)")
+                    success_count += 1
+                    timing = f"{elapsed_time:.2f}"
+                else:
+                    print(f"{base_name}: ✗ {status} ({elapsed_time:.2f}s)")
+                    fail_count += 1
+                    timing = f"{status.split(':')[0]} ({elapsed_time:.2f}s)"
+                # Record timing (only this thread writes to the log)
+                timing_f.write(f"{base_name}.txt\t{timing}\n")
+        except KeyboardInterrupt:
+            # Drop the queued learners and stop the running ones, so that
+            # leaving the executor does not wait for them
+            executor.shutdown(wait=False, cancel_futures=True)
+            learners.stop()
+            raise
     
     total_elapsed_time = time.time() - total_start_time
     
@@ -181,7 +249,16 @@ if __name__ == "__main__":
         help='Maximum value of n to process (e.g., 50 means only learn L5, L10, ..., L50). If not specified, no upper bound is applied.'
     )
     
+    parser.add_argument(
+        '--jobs',
+        type=int,
+        default=1,
+        help='Number of automata to learn in parallel (default: 1). Use 0 for one per CPU. Parallel runs share the CPU, so their recorded times are higher.'
+    )
+    
     args = parser.parse_args()
+    if args.jobs < 0:
+        parser.error("--jobs must be non-negative")
     
-    learn_ln_batch(min_n=args.min_n, max_n=args.max_n)
+    learn_ln_batch(min_n=args.min_n, max_n=args.max_n, jobs=args.jobs)
 
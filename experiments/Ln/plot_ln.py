@@ -6,9 +6,15 @@ Creates a figure showing EQ, MQ, and MM query counts vs n.
 
 import os
 import re
+import sys
 import matplotlib.pyplot as plt
+import numpy as np
 from pathlib import Path
-import glob
+
+# The "Query Statistics:" block printed by ralt_quiet.py, up to the next blank line,
+# and the query counts inside it
+STATS_RE = re.compile(r'^Query Statistics:[ \t]*\n(.*?)(?:\n[ \t]*\n|\Z)', re.MULTILINE | re.DOTALL)
+COUNT_RE = re.compile(r'^[ \t]*#(MQ|EQ|MM):[ \t]*(\d+)', re.MULTILINE)
 
 def parse_log_file(log_file_path):
     """
@@ -17,30 +23,16 @@ def parse_log_file(log_file_path):
     """
     try:
         with open(log_file_path, 'r') as f:
-            lines = f.readlines()
+            data = f.read()
         
         # Look for Query Statistics section
-        in_stats_section = False
-        mq = None
-        eq = None
-        mm = None
-        
-        for line in lines:
-            line = line.strip()
-            if line == "Query Statistics:":
-                in_stats_section = True
-                continue
-            
-            if in_stats_section:
-                if line.startswith("#MQ:"):
-                    mq = int(line.split(":")[1].strip())
-                elif line.startswith("#EQ:"):
-                    eq = int(line.split(":")[1].strip())
-                elif line.startswith("#MM:"):
-                    mm = int(line.split(":")[1].strip())
-                elif line == "" and (mq is not None or eq is not None or mm is not None):
-                    # End of stats section
-                    break
+        counts = {}
+        match = STATS_RE.search(data)
+        if match:
+            counts = dict(COUNT_RE.findall(match.group(1)))
+        mq = int(counts["MQ"]) if "MQ" in counts else None
+        eq = int(counts["EQ"]) if "EQ" in counts else None
+        mm = int(counts["MM"]) if "MM" in counts else None
         
         if mq is not None and eq is not None and mm is not None:
             return (mq, eq, mm)
@@ -58,51 +50,59 @@ def extract_n_from_filename(filename):
         return int(match.group(1))
     return None
 
-def plot_ln_queries(log_dir="learned-DRA", max_n=25):
+def plot_ln_queries(log_dir="learned-DRA", max_n=25, show=True):
     """
     Plot query statistics from Ln learning logs.
     
     Args:
         log_dir: Directory containing the log files
         max_n: Maximum n value to plot (default 25)
+        show: Whether to show the figures after saving them; if False, one
+              figure is reused for both and closed once saved
     """
-    # Find all log files
-    pattern = os.path.join(log_dir, "L*.log")
-    log_files = sorted(glob.glob(pattern))
+    # Find all Ln log files, in order of n (L2 before L10)
+    log_files = []
+    if os.path.isdir(log_dir):
+        with os.scandir(log_dir) as entries:
+            for entry in entries:
+                if entry.name.startswith("L") and entry.name.endswith(".log") and entry.is_file():
+                    n = extract_n_from_filename(entry.name)
+                    if n is not None:
+                        log_files.append((n, entry.path))
+    log_files.sort()
     
     if not log_files:
         print(f"No log files found in {log_dir}/")
         return
     
-    # Collect data
-    n_values = []
-    mq_values = []
-    eq_values = []
-    mm_values = []
-    
-    for log_file in log_files:
-        n = extract_n_from_filename(log_file)
-        if n is None or n > max_n:
-            continue
+    # Collect data, one array per column; log_files is sorted by n, so
+    # the rows come out in order
+    n_values = np.empty(len(log_files), dtype=np.int32)
+    mq_values = np.empty(len(log_files), dtype=np.int64)
+    eq_values = np.empty(len(log_files), dtype=np.int64)
+    mm_values = np.empty(len(log_files), dtype=np.int64)
+    count = 0
+    
+    for n, log_file in log_files:
+        if n > max_n:
+            break
         
         query_counts = parse_log_file(log_file)
         if query_counts is not None:
-            mq, eq, mm = query_counts
-            n_values.append(n)
-            mq_values.append(mq)
-            eq_values.append(eq)
-            mm_values.append(mm)
+            n_values[count] = n
+            mq_values[count], eq_values[count], mm_values[count] = query_counts
+            count += 1
     
-    if not n_values:
+    if count == 0:
         print("No valid data found to plot")
         return
-    
-    # Sort by n
-    sorted_data = sorted(zip(n_values, mq_values, eq_values, mm_values))
-    n_values, mq_values, eq_values, mm_values = zip(*sorted_data)
+    n_values = n_values[:count]
+    mq_values = mq_values[:count]
+    eq_values = eq_values[:count]
+    mm_values = mm_values[:count]
     
     # Create first figure: MMs and EQs
-    plt.figure(figsize=(14, 10))
+    fig = plt.figure(figsize=(14, 10))
     
     plt.plot(n_values, eq_values, marker='o', label='Equivalence Queries (EQ)', linewidth=5, markersize=14)
     plt.plot(n_values, mm_values, marker='^', label='Memorability Queries (MM)', linewidth=5, markersize=14)
@@ -130,8 +130,11 @@ def plot_ln_queries(log_dir="learned-DRA", max_n=25):
     plt.savefig(output_file1, dpi=300, bbox_inches='tight')
     print(f"Figure 1 saved to {output_file1}")
     
-    # Create second figure: MQs
-    plt.figure(figsize=(14, 10))
+    # Create second figure: MQs (when nothing is shown, reuse the first one)
+    if show:
+        plt.figure(figsize=(14, 10))
+    else:
+        fig.clf()
     
     plt.plot(n_values, mq_values, marker='s', label='Membership Queries (MQ)', linewidth=5, markersize=14, color='green')
     
@@ -159,7 +162,10 @@ def plot_ln_queries(log_dir="learned-DRA", max_n=25):
     print(f"Figure 2 saved to {output_file2}")
     
     # Also show the plots
-    plt.show()
+    if show:
+        plt.show()
+    else:
+        plt.close(fig)
 
 def main():
     import argparse
@@ -180,9 +186,20 @@ def main():
         help='Maximum n value to plot (default: 25)'
     )
     
+    parser.add_argument(
+        '--no-show',
+        action='store_true',
+        help='Only save the figures, without showing them (default when stdout is not a terminal)'
+    )
+    
     args = parser.parse_args()
     
-    plot_ln_queries(args.log_dir, args.max_n)
+    show = not args.no_show and sys.stdout.isatty()
+    if not show:
+        # No window is opened, so skip the GUI backend; this is done here rather
+        # than in plot_ln_queries so that importing callers keep their backend
+        plt.switch_backend('Agg')
+    plot_ln_queries(args.log_dir, args.max_n, show=show)
 
 if __name__ == "__main__":
     main()
@@ -112,7 +112,7 @@ class RegisterAutomatonLearner:
         """
         forget_set = set()
         memorable_letters = set(next_memorable.letters)
-        extended_sequence = current_memorable.letters + [new_letter]
+        extended_sequence = current_memorable.letters + (new_letter,)
 
         for idx, letter in enumerate(extended_sequence):
             if letter not in memorable_letters or (idx < len(extended_sequence) - 1 and letter == new_letter):
@@ -110,8 +110,7 @@ class ObservationTable:
         """
         extensions = row.row_memorable.get_letter_extension(self.alphabet.comparator)
         extended_set: Set[Tuple[LetterSeq, LetterSeq]] = set()
-        for letter in extensions.letters:
-            extended_prefix = row.row_prefix.concat(LetterSeq([letter]))
+        for extended_prefix in row.row_prefix.append_many(extensions.letters):
             extended_memorable = self.memorable_sequence_query(extended_prefix)
             extended_set.add((extended_prefix, extended_memorable))
         return extended_set
@@ -23,10 +23,10 @@ def find_difference(
     if A.alphabet.letter_type != B.alphabet.letter_type:
         raise Exception("Two automata letter_type mismatch")
 
-    # ---- Step 0: Preprocessing, check whether a state is sink rejecting
-
-    sink_locs_A = A.get_sink_rejecting_locations()
-    sink_locs_B = B.get_sink_rejecting_locations()
+    # ---- Step 0: Preprocessing, locations that can still reach acceptance
+    # (a pair where neither can is never extended to a distinguishing word)
+    live_locs_A = A.get_accepting_distances()
+    live_locs_B = B.get_accepting_distances()
     # ---- Step 1: Compute resulting configurations of u and v ----
     conf_u = A.run(u)[-1]  # (loc_u, reg_u, _)
     conf_v = B.run(v)[-1]  # (loc_v, reg_v, _)
@@ -37,14 +37,17 @@ def find_difference(
     # Each element in the queue is ((loc1, reg1), (loc2, reg2), w_prefix)
     queue = deque([((loc_u, reg_u), (loc_v, reg_v), [])])
     visited = set()
+    # visited configuration pairs, up to the type of their registers
+    visited_types: Set[Type_Key] = set()
 
     while queue:
         (l1, r1), (l2, r2), w_prefix = queue.popleft()
         # Avoid revisiting
-        key = (l1, tuple(r1.letters), l2, tuple(r2.letters))
+        key = (l1, r1.letters, l2, r2.letters)
         if key in visited:
             continue
         visited.add(key)
+        visited_types.add(get_type_key(A, l1, r1, l2, r2))
 
         # ---- Step 3: Explore all possible next-letter transitions ----
         # For correctness, we symbolically explore all combinations of next transitions
@@ -56,81 +59,71 @@ def find_difference(
         # print("r2 ", r2)
         # print("next_letters ", next_letters)
         for next_letter in next_letters:
+            # print("chosen letter ", next_letter)
+            input_tau1 = r1.append(next_letter)
+            input_tau2 = r2.append(next_letter)
+            # transitions of B enabled on next_letter, with their new registers
+            enabled2 = [
+                (t2, input_tau2.keep_by_indices(t2.indices_to_keep))
+                for t2 in B.locations[l2].transitions
+                if A.alphabet.test_type(input_tau2, t2.tau)
+            ]
+            if not enabled2:
+                continue
+            new_w = w_prefix + [next_letter]
             for t1 in A.locations[l1].transitions:
-                for t2 in B.locations[l2].transitions:
-                    # print("chosen letter ", next_letter)
-                    input_tau1 = r1.append(next_letter)
-                    input_tau2 = r2.append(next_letter)
-                    if A.alphabet.test_type(
-                        input_tau1, t1.tau
-                    ) and A.alphabet.test_type(input_tau2, t2.tau):
-                        new_r1 = input_tau1.remove_by_indices(t1.indices_to_remove)
-                        new_r2 = input_tau2.remove_by_indices(t2.indices_to_remove)
-                        new_w = w_prefix + [next_letter]
-                        # If one configuration is accepting and the other is not → found distinguishing w
-                        if (
-                            A.locations[t1.target].accepting
-                            != B.locations[t2.target].accepting
-                        ):
-                            return A.alphabet.form_sequence(new_w)
-                        # if replace_map is not None:
-                        #     w = A.alphabet.form_sequence(new_w)
-                        #     mapped_w = A.alphabet.apply_map(w, replace_map)
-                        #     u_w = u.concat(w)
-                        #     v_mapped_w = v.concat(mapped_w)
-                        #     if not A.alphabet.test_type(u_w, v_mapped_w):
-                        #         continue
-                        if (
-                            t1.target not in sink_locs_A or t2.target not in sink_locs_B
-                        ) and can_add_to_queue(
-                            A,
-                            visited,
-                            (
-                                t1.target,
-                                tuple(new_r1.letters),
-                                t2.target,
-                                tuple(new_r2.letters),
-                            ),
-                        ):
-                            queue.append(
-                                ((t1.target, new_r1), (t2.target, new_r2), new_w)
-                            )
+                if not A.alphabet.test_type(input_tau1, t1.tau):
+                    continue
+                new_r1 = input_tau1.keep_by_indices(t1.indices_to_keep)
+                for t2, new_r2 in enabled2:
+                    # If one configuration is accepting and the other is not → found distinguishing w
+                    if (
+                        A.locations[t1.target].accepting
+                        != B.locations[t2.target].accepting
+                    ):
+                        return A.alphabet.form_sequence(new_w)
+                    # if replace_map is not None:
+                    #     w = A.alphabet.form_sequence(new_w)
+                    #     mapped_w = A.alphabet.apply_map(w, replace_map)
+                    #     u_w = u.concat(w)
+                    #     v_mapped_w = v.concat(mapped_w)
+                    #     if not A.alphabet.test_type(u_w, v_mapped_w):
+                    #         continue
+                    if (
+                        t1.target in live_locs_A or t2.target in live_locs_B
+                    ) and get_type_key(
+                        A, t1.target, new_r1, t2.target, new_r2
+                    ) not in visited_types:
+                        queue.append(
+                            ((t1.target, new_r1), (t2.target, new_r2), new_w)
+                        )
 
     # No distinguishing word found
     return None
 
 
-Key_Type = Tuple[
+Type_Key = Tuple[
     int,  # l1
-    Tuple[Letter, ...],  # tuple(r1.letters)
     int,  # l2
-    Tuple[Letter, ...],  # tuple(r2.letters)
+    Tuple[int, ...],  # type signature of r1 + r2
 ]
 
 
-def can_add_to_queue(
-    target: RegisterAutomaton, visited: Set[Key_Type], key: Key_Type
-) -> bool:
-    if key in visited:
-        return False
-    for existing_key in visited:
-        l1_e, r1_e, l2_e, r2_e = existing_key
-        l1_k, r1_k, l2_k, r2_k = key
-        r1_seq_e = target.alphabet.form_sequence(list(r1_e))
-        r1_seq_k = target.alphabet.form_sequence(list(r1_k))
-        r2_seq_e = target.alphabet.form_sequence(list(r2_e))
-        r2_seq_k = target.alphabet.form_sequence(list(r2_k))
-        join_e_seq = r1_seq_e.concat(r2_seq_e)
-        join_k_seq = r1_seq_k.concat(r2_seq_k)
-        if l1_e == l1_k and l2_e == l2_k:
-            if target.alphabet.test_type(join_e_seq, join_k_seq):
-                return False
-    return True
+def get_type_key(
+    target: RegisterAutomaton, l1: int, r1: LetterSeq, l2: int, r2: LetterSeq
+) -> Type_Key:
+    """
+    Key of a configuration pair ((l1, r1), (l2, r2)) in the search of find_difference.
+    Two pairs have the same key iff they are at the same locations and the
+    concatenated registers r1 + r2 are of the same type, in which case exploring
+    one of them suffices.
+    """
+    return (l1, l2, target.alphabet.get_type_signature(r1.concat(r2)))
 
 
 def get_memorable_seq(target: RegisterAutomaton, u: LetterSeq):
     # bs = u.get_letter_extension(target.alphabet.comparator)
-    u_sorted = sorted(set(u.letters), key=lambda x: x.value)
+    u_values = u.get_distinct_values()
     memorables = set()
 
     for a in u.letters:
@@ -138,14 +131,14 @@ def get_memorable_seq(target: RegisterAutomaton, u: LetterSeq):
             continue
         # print("check ", a, " memorable ", u)
         # compute a letter b such that a != b, yet, u sim_R u'
-        index = u_sorted.index(a)
+        index = bisect.bisect_left(u_values, a.value)
         b = None
         if index == 0:
             b = target.alphabet.make_letter(a.value - 0.5)
-        elif index == len(u_sorted) - 1:
+        elif index == len(u_values) - 1:
             b = target.alphabet.make_letter(a.value + 0.5)
         else:
-            b = target.alphabet.make_letter((a.value + u_sorted[index + 1].value) / 2.0)
+            b = target.alphabet.make_letter((a.value + u_values[index + 1]) / 2.0)
 
         # we try to replace b with a, and check whether map(u) and u can be distinguished by some v
         def replace_a_with_b(c: Letter) -> Letter:
@@ -173,12 +166,10 @@ def get_memorable_seq(target: RegisterAutomaton, u: LetterSeq):
             mem_map[a] = idx
 
     # obtain the corresponding memorable sequence
-    result = target.alphabet.empty_sequence()
-    for idx, a in enumerate(u.letters):
-        if idx in mem_map.values():
-            result = result.append(a)
-
-    return result
+    kept_indices = set(mem_map.values())
+    return target.alphabet.form_sequence(
+        [a for idx, a in enumerate(u.letters) if idx in kept_indices]
+    )
 
 
 class Teacher: